@@ -31,55 +31,77 @@ from deliriumviz import corrections_loader, heatmap
 
 
 # -----------------------------------------------------------------------------
-# Configuración general de la aplicación
+# Aplicación
 # -----------------------------------------------------------------------------
-st.set_page_config(
-    page_title="Corrections report viewer",
-    layout="wide"
-)
-
-st.title("Corrections report viewer")
-
-
-# -----------------------------------------------------------------------------
-# Inputs de fechas
-# -----------------------------------------------------------------------------
-# Se utilizan dos columnas para seleccionar la fecha de inicio y fin
-col1, col2 = st.columns(2)
-
-with col1:
-    fecha_inicio = st.date_input(
-        "Fecha inicio",
-        value=date(2022, 7, 10),
-        help="Seleccione la fecha inicial del rango a analizar."
+def main():
+    """
+    Construye la interfaz de la aplicación.
+    """
+    # -----------------------------------------------------------------
+    # Configuración general de la aplicación
+    # -----------------------------------------------------------------
+    st.set_page_config(
+        page_title="Corrections report viewer",
+        layout="wide"
     )
 
-with col2:
-    fecha_fin = st.date_input(
-        "Fecha fin",
-        value=date(2022, 7, 15),
-        help="Seleccione la fecha final del rango a analizar."
-    )
-
-
-# -----------------------------------------------------------------------------
-# Acción principal
-# -----------------------------------------------------------------------------
-# Al presionar el botón se cargan y procesan los reportes
-if st.button("Cargar reportes"):
-
-    # Llamada a la función principal de carga
-    # Las fechas tipo `date` son convertidas internamente a `datetime`
-    df = corrections_loader(fecha_inicio, fecha_fin)
-
-    # Validación del resultado
-    if df.empty:
-        st.warning("No se encontraron datos para el rango seleccionado.")
-    else:
-        # Visualización de la tabla consolidada
-        st.subheader("Tabla de correcciones")
-        st.dataframe(df, use_container_width=True)
-
-        # Visualización de los mapas de calor
-        st.subheader("Heatmap de correcciones")
-        heatmap(df)
+    st.title("Corrections report viewer")
+
+    # -----------------------------------------------------------------
+    # Inputs de fechas
+    # -----------------------------------------------------------------
+    # Se utilizan dos columnas para seleccionar la fecha de inicio y fin
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fecha_inicio = st.date_input(
+            "Fecha inicio",
+            value=date(2022, 7, 10),
+            help="Seleccione la fecha inicial del rango a analizar."
+        )
+
+    with col2:
+        fecha_fin = st.date_input(
+            "Fecha fin",
+            value=date(2022, 7, 15),
+            help="Seleccione la fecha final del rango a analizar."
+        )
+
+    # -----------------------------------------------------------------
+    # Acción principal
+    # -----------------------------------------------------------------
+    # Al presionar el botón se cargan y procesan los reportes
+    if st.button("Cargar reportes"):
+
+        # Llamada a la función principal de carga
+        # Las fechas tipo `date` son convertidas internamente a `datetime`
+        df = corrections_loader(fecha_inicio, fecha_fin)
+
+        # Validación del resultado
+        if df.empty:
+            st.warning("No se encontraron datos para el rango seleccionado.")
+        else:
+            # Visualización de la tabla consolidada
+            st.subheader("Tabla de correcciones")
+            # La humedad se almacena como número; el símbolo "%" se agrega
+            # solo al mostrarla
+            st.dataframe(
+                df,
+                use_container_width=True,
+                column_config={
+                    "Tunnel Relative Humidity": st.column_config.NumberColumn(
+                        format="%.1f%%"
+                    )
+                }
+            )
+
+            # Visualización de los mapas de calor
+            st.subheader("Heatmap de correcciones")
+            heatmap(df)
+
+
+# Streamlit ejecuta este script como "__main__". Los procesos con los que
+# "corrections_loader" parsea los reportes lo vuelven a importar (como
+# "__mp_main__"), por lo que la interfaz solo debe construirse aquí
+if __name__ == "__main__":
+    main()
@@ -18,25 +18,30 @@ se encuentra encapsulada en el módulo "deliriumviz_helpers".
 # -----------------------------------------------------------------------------
 # Imports estándar
 # -----------------------------------------------------------------------------
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from datetime import datetime
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 # -----------------------------------------------------------------------------
 # Imports de terceros
 # -----------------------------------------------------------------------------
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 import matplotlib.pyplot as plt
-import seaborn as sns
 import streamlit as st
 
 # -----------------------------------------------------------------------------
 # Imports locales (helpers internos)
 # -----------------------------------------------------------------------------
 from deliriumviz_helpers import (
-    _leer_html,
-    _leer_tablas,
-    _procesar_tablas,
+    _FORMATO_TIMESTAMP,
+    _precargar_html,
+    _procesar_un_reporte,
     _asegurar_datetime,
     _buscar_reportes_html,
 )
@@ -45,9 +50,6 @@ from deliriumviz_helpers import (
 # Configuración global
 # -----------------------------------------------------------------------------
 
-#: Zona horaria local utilizada para validación de fechas
-ZONA_LOCAL = "America/Santiago"
-
 #: Prefijo base de los archivos HTML de correcciones
 NOMBRE_BASE = "corrections_report"
 
@@ -60,6 +62,153 @@ BASE_DIR = Path(__file__).resolve().parent.parent  # Para GitHub
 #: Directorio donde se almacenan los reportes HTML
 DATA_DIR = BASE_DIR / "data"
 
+#: Número de procesos utilizados para procesar reportes en paralelo
+MAX_WORKERS = os.cpu_count() or 1
+
+#: Número de hilos que despachan reportes al pool de procesos. Al ser el
+#: doble de procesos, hasta MAX_WORKERS reportes esperan en cola con su
+#: lectura desde disco ya solicitada
+MAX_HILOS = 2 * MAX_WORKERS
+
+#: Máximo de celdas de un mapa de calor para las que se dibujan anotaciones
+MAX_CELDAS_ANOTADAS = 400
+
+#: Tiempo (segundos) que se conserva en caché el resultado de la búsqueda
+TTL_BUSQUEDA = 300
+
+#: Máximo de reportes parseados que se conservan en caché (unos tres años
+#: de reportes diarios); al superarlo se descartan los menos usados
+MAX_REPORTES_CACHE = 3 * 366
+
+#: Serializa el reemplazo del pool de procesos cuando queda inutilizable
+_LOCK_POOL = threading.Lock()
+
+# -----------------------------------------------------------------------------
+# Funciones internas con caché
+# -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _pool_procesos():
+    """
+    Retorna el pool de procesos compartido por todas las sesiones.
+
+    Se crea una sola vez por servidor para no pagar el arranque de los
+    procesos en cada consulta. Se usa "spawn" porque el servidor de
+    Streamlit es multi-hilo y "fork" no es seguro en ese contexto.
+
+    Solo se utiliza dentro de "streamlit run": los procesos "spawn"
+    vuelven a importar el script principal, lo que en un script sin
+    ``if __name__ == "__main__":`` lo ejecutaría de nuevo en cada proceso.
+    """
+    return ProcessPoolExecutor(
+        max_workers=MAX_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _reiniciar_pool(pool_roto):
+    """
+    Reemplaza el pool de procesos en caché si es el que quedó roto (por
+    ejemplo, porque un proceso murió por falta de memoria) y retorna el
+    pool vigente.
+
+    Varios hilos pueden detectar la falla a la vez: el lock garantiza que
+    solo el primero descarte el pool y el resto reciba el nuevo.
+    """
+    with _LOCK_POOL:
+        if _pool_procesos() is pool_roto:
+            _pool_procesos.clear()
+            pool_roto.shutdown(wait=False, cancel_futures=True)
+
+        return _pool_procesos()
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_REPORTES_CACHE)
+def _procesar_reporte(path_str, mtime, _pool):
+    """
+    Procesa un único reporte HTML, retornando una tupla de DataFrames.
+    Si se entrega un pool de procesos el parsing ocurre en él; con
+    "_pool" igual a None se realiza en el hilo que llama.
+
+    El resultado queda en caché de Streamlit indexado por ruta y fecha de
+    modificación del archivo, de modo que consultas repetidas o rangos
+    solapados no vuelven a parsear el HTML. El parámetro "mtime" solo se
+    utiliza como parte de la clave de caché y "_pool" (con guion bajo)
+    queda excluido de ella. La caché guarda a lo sumo
+    "MAX_REPORTES_CACHE" reportes, por lo que versiones antiguas de un
+    archivo modificado terminan siendo descartadas.
+
+    Antes de encolar el trabajo se solicita la precarga del archivo, para
+    que su lectura se solape con el parsing de los reportes anteriores.
+
+    Si el pool quedó inutilizable ("BrokenProcessPool"), se reemplaza y
+    el reporte se reintenta una sola vez.
+    """
+    if _pool is None:
+        return tuple(_procesar_un_reporte(path_str))
+
+    _precargar_html(path_str)
+
+    try:
+        return tuple(_pool.submit(_procesar_un_reporte, path_str).result())
+    except BrokenProcessPool:
+        pool = _reiniciar_pool(_pool)
+        return tuple(pool.submit(_procesar_un_reporte, path_str).result())
+
+
+def _cargar_reporte(path, pool):
+    """
+    Obtiene los DataFrames de un reporte, usando la caché si corresponde.
+
+    Se ejecuta dentro de los hilos de trabajo, por lo que no debe invocar
+    elementos de Streamlit. Con un pool de procesos los hilos solo
+    despachan el trabajo y esperan su resultado; sin él (pool None), el
+    parsing ocurre en el propio hilo.
+    """
+    return _procesar_reporte(str(path), path.stat().st_mtime, pool)
+
+
+def _mtimes_directorios(data_dir, fecha_inicio, fecha_fin):
+    """
+    Retorna las fechas de modificación (ns) del directorio base y de los
+    directorios YYYY/MM que cubre el rango. Los directorios inexistentes
+    se representan con None.
+    """
+    directorios = [data_dir]
+
+    anio, mes = fecha_inicio.year, fecha_inicio.month
+    while (anio, mes) <= (fecha_fin.year, fecha_fin.month):
+        directorios.append(data_dir / f"{anio:04d}" / f"{mes:02d}")
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+    mtimes = []
+    for directorio in directorios:
+        try:
+            mtimes.append(directorio.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+
+    return tuple(mtimes)
+
+
+@st.cache_data(ttl=TTL_BUSQUEDA, show_spinner=False)
+def _buscar_reportes_cacheado(data_dir, fecha_inicio, fecha_fin, mtimes):
+    """
+    Versión en caché de "_buscar_reportes_html".
+
+    Las fechas se reciben como strings ISO y "mtimes" solo forma parte de
+    la clave de caché: si cambia el contenido de alguno de los directorios
+    del rango la búsqueda se vuelve a ejecutar. El TTL acota el tiempo que
+    un archivo ubicado fuera de la estructura YYYY/MM tarda en aparecer.
+    """
+    return _buscar_reportes_html(
+        data_dir=Path(data_dir),
+        nombre_base=NOMBRE_BASE,
+        fecha_inicio=datetime.fromisoformat(fecha_inicio),
+        fecha_fin=datetime.fromisoformat(fecha_fin),
+        formato_fecha=FORMATO_FECHA,
+    )
+
+
 # -----------------------------------------------------------------------------
 # Funciones públicas
 # -----------------------------------------------------------------------------
@@ -95,27 +244,14 @@ def corrections_loader(fecha_inicio, fecha_fin):
     fecha_inicio = _asegurar_datetime(fecha_inicio, "fecha_inicio")
     fecha_fin = _asegurar_datetime(fecha_fin, "fecha_fin")
 
-    try:
-        fecha_inicio.replace(
-            tzinfo=ZoneInfo(ZONA_LOCAL)
-        ).astimezone(ZoneInfo("UTC"))
-
-        fecha_fin.replace(
-            tzinfo=ZoneInfo(ZONA_LOCAL)
-        ).astimezone(ZoneInfo("UTC"))
-    except Exception as e:
-        st.error(f"Error convirtiendo fechas: {e}")
-        return pd.DataFrame()
-
     # -----------------------------------------------------------------
     # Búsqueda flexible de archivos HTML
     # -----------------------------------------------------------------
-    paths_html = _buscar_reportes_html(
-        data_dir=DATA_DIR,
-        nombre_base=NOMBRE_BASE,
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        formato_fecha=FORMATO_FECHA,
+    paths_html = _buscar_reportes_cacheado(
+        str(DATA_DIR),
+        fecha_inicio.isoformat(),
+        fecha_fin.isoformat(),
+        _mtimes_directorios(DATA_DIR, fecha_inicio, fecha_fin),
     )
 
     if not paths_html:
@@ -125,25 +261,54 @@ def corrections_loader(fecha_inicio, fecha_fin):
     # -----------------------------------------------------------------
     # Procesamiento de archivos encontrados
     # -----------------------------------------------------------------
+    # Cada archivo se despacha desde un hilo independiente: los aciertos de
+    # caché se resuelven en el mismo hilo y el resto se parsea en el pool
+    # de procesos. Los resultados se recogen en el hilo principal y en el
+    # orden original, ya que Streamlit no es thread-safe.
     resultados = []
-
-    for path in paths_html:
-        nombre_archivo = path.name
-
-        try:
-            html = _leer_html(path)
-            soup = BeautifulSoup(html, "lxml")
-            tablas = _leer_tablas(path, nombre_archivo)
-
-            resultados.extend(
-                _procesar_tablas(tablas, soup, nombre_archivo)
+    mensajes = []
+    hubo_errores = False
+
+    # Fuera de "streamlit run" (scripts o Jupyter) no se usa el pool de
+    # procesos, que volvería a ejecutar el script del usuario en cada
+    # proceso, y el parsing ocurre en los hilos. Tampoco hay dónde
+    # mostrar el contenedor de estado, por lo que se omite
+    en_streamlit = st.runtime.exists()
+    pool = _pool_procesos() if en_streamlit else None
+
+    if en_streamlit:
+        contexto_estado = st.status("Cargando reportes…", expanded=False)
+    else:
+        contexto_estado = nullcontext()
+
+    with contexto_estado as status:
+        with ThreadPoolExecutor(max_workers=MAX_HILOS) as executor:
+            futuros = [
+                (path.name, executor.submit(_cargar_reporte, path, pool))
+                for path in paths_html
+            ]
+
+            for nombre_archivo, futuro in futuros:
+                try:
+                    resultados.extend(futuro.result())
+
+                    mensajes.append(f"- Archivo procesado: {nombre_archivo}")
+
+                except Exception as e:
+                    hubo_errores = True
+                    mensajes.append(
+                        f"- Error procesando {nombre_archivo}: {e}"
+                    )
+
+        # Un único elemento con el detalle de todos los archivos, en lugar
+        # de un mensaje de Streamlit por archivo
+        if status is not None:
+            status.write("\n".join(mensajes))
+            status.update(
+                label=f"Reportes procesados: {len(paths_html)}",
+                state="error" if hubo_errores else "complete",
             )
 
-            st.success(f"Archivo procesado: {nombre_archivo}")
-
-        except Exception as e:
-            st.error(f"Error procesando {nombre_archivo}: {e}")
-
     # -----------------------------------------------------------------
     # Consolidación final
     # -----------------------------------------------------------------
@@ -151,7 +316,26 @@ def corrections_loader(fecha_inicio, fecha_fin):
         df_final = pd.concat(resultados, ignore_index=True)
 
         df_final["Timestamp"] = pd.to_datetime(
-            df_final["Timestamp"], errors="coerce"
+            df_final["Timestamp"], format=_FORMATO_TIMESTAMP, errors="coerce"
+        )
+
+        # Columnas respaldadas por Arrow: Streamlit las transfiere sin
+        # conversión y ocupan menos memoria que las de tipo object
+        df_final["Tunnel Relative Humidity"] = (
+            df_final["Tunnel Relative Humidity"].astype("float32[pyarrow]")
+        )
+
+        columnas_texto = df_final.select_dtypes(
+            include=["object", "string"]
+        ).columns
+        df_final = df_final.astype(
+            {col: "string[pyarrow]" for col in columnas_texto}
+        )
+
+        # Pocas líneas de retardo distintas: como categoría se almacenan
+        # como códigos enteros y se agrupan más rápido en "heatmap"
+        df_final["Delay line number"] = (
+            df_final["Delay line number"].astype("category")
         )
 
         return df_final
@@ -180,50 +364,105 @@ def heatmap(df_final):
         st.error(f"Faltan columnas: {columnas_req - set(df_final.columns)}")
         return
 
-    if not pd.api.types.is_datetime64_any_dtype(df_final["Timestamp"]):
-        df_final["Timestamp"] = pd.to_datetime(
-            df_final["Timestamp"], errors="coerce"
+    # La fecha de cada fila se calcula como arreglo local (datetime64[D]),
+    # sin agregar ni modificar columnas del DataFrame recibido
+    fechas = (
+        pd.to_datetime(
+            df_final["Timestamp"].to_numpy(),
+            format=_FORMATO_TIMESTAMP,
+            errors="coerce"
         )
+        .to_numpy()
+        .astype("datetime64[D]")
+    )
 
-    df_final["Fecha"] = df_final["Timestamp"].dt.date
+    max_rail = df_final["Rail number"].max()
+    if pd.isna(max_rail):
+        return
 
-    for fecha in sorted(df_final["Fecha"].dropna().unique()):
-        df_dia = df_final[df_final["Fecha"] == fecha]
-        if df_dia.empty:
-            continue
+    # Los grupos de rieles se representan con el código entero del
+    # intervalo; las etiquetas "(a, b]" solo se usan en los ejes
+    bins = np.arange(0, int(max_rail) + 10, 5)
+    etiquetas_bins = pd.IntervalIndex.from_breaks(bins).astype(str)
+
+    claves = pd.DataFrame({
+        "Fecha": fechas,
+        "Delay line number": df_final["Delay line number"],
+        "rail_bin": pd.cut(df_final["Rail number"], bins=bins, labels=False),
+    }).dropna(subset=["rail_bin"])
+    claves["rail_bin"] = claves["rail_bin"].astype("int16")
+
+    # Conteo de ajustes por (día, línea de retardo, grupo de rieles) en una
+    # sola pasada; luego cada día se obtiene indexando este resultado
+    conteos = (
+        claves
+        .groupby(
+            ["Fecha", "Delay line number", "rail_bin"],
+            observed=True,
+            sort=False
+        )
+        .size()
+        .unstack("rail_bin", fill_value=0)
+        .sort_index()
+        .sort_index(axis=1)
+    )
 
-        max_rail = df_dia["Rail number"].max()
-        if pd.isna(max_rail):
-            continue
+    # Una única figura (ejes del mapa + ejes de la barra de color) que se
+    # reutiliza para todos los días; st.pyplot la rasteriza en cada llamada
+    fig, (ax, cax) = plt.subplots(
+        1, 2,
+        figsize=(12, 6),
+        layout="constrained",
+        gridspec_kw={"width_ratios": [40, 1]},
+    )
 
-        df_dia = df_dia.copy()
-        df_dia["rail_bin"] = pd.cut(
-            df_dia["Rail number"],
-            bins=range(0, int(max_rail) + 10, 5)
-        )
+    for fecha in conteos.index.unique(level="Fecha"):
+        tabla = conteos.loc[fecha]
 
-        tabla = pd.crosstab(
-            df_dia["Delay line number"],
-            df_dia["rail_bin"]
-        )
+        # Solo se muestran los grupos de rieles con ajustes en el día
+        tabla = tabla.loc[:, (tabla > 0).any()]
 
         if tabla.empty:
             continue
 
-        st.subheader(f"Mapa de calor – {fecha}")
+        st.subheader(f"Mapa de calor – {fecha.date()}")
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.heatmap(
-            tabla,
-            annot=True,
-            fmt="d",
-            cmap="YlGnBu",
-            linewidths=0.5,
-            ax=ax
-        )
+        ax.clear()
+        cax.clear()
+
+        valores = tabla.to_numpy()
+        im = ax.imshow(valores, cmap="YlGnBu", aspect="auto")
+
+        ax.set_xticks(range(valores.shape[1]))
+        ax.set_xticklabels(etiquetas_bins[tabla.columns], rotation=90)
+        ax.set_yticks(range(valores.shape[0]))
+        ax.set_yticklabels([str(i) for i in tabla.index])
+
+        # Las anotaciones por celda son el costo dominante del gráfico,
+        # por lo que se omiten en tablas muy grandes
+        if valores.size <= MAX_CELDAS_ANOTADAS:
+            # Como en seaborn, el texto es blanco sobre celdas oscuras y
+            # negro sobre celdas claras, según la luminancia relativa
+            # (WCAG) del color de cada celda
+            rgb = im.to_rgba(valores)[..., :3]
+            rgb = np.where(
+                rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4
+            )
+            oscuras = rgb @ np.array([0.2126, 0.7152, 0.0722]) <= 0.408
+
+            for fila in range(valores.shape[0]):
+                for col in range(valores.shape[1]):
+                    ax.text(
+                        col, fila, valores[fila, col],
+                        ha="center", va="center",
+                        color="white" if oscuras[fila, col] else "black"
+                    )
+
+        fig.colorbar(im, cax=cax)
 
         ax.set_xlabel("Grupo de rieles")
         ax.set_ylabel("Línea de retardo")
 
         st.pyplot(fig)
-        plt.close(fig)
+
+    plt.close(fig)
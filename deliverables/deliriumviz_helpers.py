@@ -8,8 +8,9 @@ reportes de correcciones en formato HTML.
 Este módulo encapsula la lógica de bajo nivel utilizada por el módulo
 principal "deliriumviz", incluyendo:
 
-- Lectura de archivos HTML desde disco.
-- Extracción de tablas HTML mediante pandas.
+- Lectura de archivos HTML desde disco mediante mapeo en memoria.
+- Recorrido en streaming del HTML con lxml, extrayendo cada tabla mediante
+  pandas sin construir el árbol completo del documento.
 - Parsing de información específica desde el contenido HTML (por ejemplo, humedad relativa).
 - Procesamiento y consolidación de tablas en estructuras pandas.
 - Búsqueda robusta de reportes HTML dentro de un rango de fechas,
@@ -23,46 +24,164 @@ final. Deben ser llamadas únicamente desde "deliriumviz.py".
 # -----------------------------------------------------------------------------
 # Imports
 # -----------------------------------------------------------------------------
+import io
+import mmap
+import os
 import re
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
+from lxml import etree
+
+
+# -----------------------------------------------------------------------------
+# Constantes
+# -----------------------------------------------------------------------------
+#: Campos de la tabla informativa que se agregan a cada fila de
+#: correcciones, en el orden en que aparecen como columnas
+_COLUMNAS_REQ = ("Timestamp", "Delay line number")
+
+
+# -----------------------------------------------------------------------------
+# Expresiones regulares
+# -----------------------------------------------------------------------------
+#: Porcentaje de humedad dentro del texto de una etiqueta <h3>
+_RE_HUMEDAD = re.compile(r"(\d+(?:\.\d+)?)%")
+
+#: Formato de los Timestamp de los reportes ("YYYY-MM-DD HH:MM[:SS]").
+#: "ISO8601" usa el parser vectorizado de pandas y evita inferir el formato
+#: valor a valor, aceptando variantes con o sin segundos
+_FORMATO_TIMESTAMP = "ISO8601"
 
 
 # -----------------------------------------------------------------------------
 # Lectura de archivos
 # -----------------------------------------------------------------------------
+@contextmanager
 def _leer_html(path):
     """
-    Lee el contenido completo de un archivo HTML y lo retorna como texto.
+    Abre un archivo HTML mapeado en memoria (solo lectura).
+
+    Se utiliza como context manager y entrega un objeto tipo archivo que
+    lxml consume por bloques, sin copiar el archivo completo a un objeto
+    bytes de Python. Los archivos vacíos (que no se pueden mapear) se
+    entregan como un buffer vacío.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield io.BytesIO(b"")
+            return
 
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contenido:
+            yield contenido
 
-def _leer_tablas(path, nombre_archivo):
+
+def _precargar_html(path):
     """
-    Lee las tablas HTML de un archivo utilizando pandas.
+    Indica al sistema operativo que el archivo se leerá pronto
+    (POSIX_FADV_WILLNEED), de modo que la lectura desde disco ocurra en
+    segundo plano mientras se procesan otros reportes.
+
+    Es solo una sugerencia: no hace nada en plataformas sin
+    "os.posix_fadvise" y los errores se ignoran.
     """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+
     try:
-        return pd.read_html(path, index_col=0)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _tabla_a_dataframe(elem):
+    """
+    Convierte un elemento <table> de lxml en DataFrame, usando la primera
+    columna como índice.
+    """
+    return pd.read_html(
+        io.StringIO(etree.tostring(elem, encoding="unicode")),
+        index_col=0,
+        flavor="lxml"
+    )[0]
+
+
+def _leer_tablas(contenido, nombre_archivo):
+    """
+    Recorre el HTML en una sola pasada con "lxml.etree.iterparse" y
+    retorna las tablas (como DataFrames) y los textos de las etiquetas <h3>.
+
+    "contenido" es el objeto tipo archivo entregado por "_leer_html".
+
+    Cada <table> se serializa de forma individual antes de entregarla a
+    pandas y luego se libera junto con los elementos ya procesados, por
+    lo que nunca se construye el árbol completo del documento.
+
+    Las tablas vienen en pares (informativa, correcciones). Si el texto
+    de la tabla informativa no contiene los campos de "_COLUMNAS_REQ", el
+    par completo se descarta sin construir ninguno de sus DataFrames.
+    """
+    tablas = []
+    titulos = []
+    esperando_correcciones = False
+    omitir_correcciones = False
+
+    try:
+        for _, elem in etree.iterparse(
+            contenido,
+            events=("end",),
+            tag=("table", "h3"),
+            html=True,
+            encoding="utf-8",
+        ):
+            if elem.tag == "table":
+                if esperando_correcciones:
+                    tablas.append(_tabla_a_dataframe(elem))
+                    esperando_correcciones = False
+                elif omitir_correcciones:
+                    omitir_correcciones = False
+                else:
+                    texto = " ".join("".join(elem.itertext()).split())
+                    if all(col in texto for col in _COLUMNAS_REQ):
+                        tablas.append(_tabla_a_dataframe(elem))
+                        esperando_correcciones = True
+                    else:
+                        omitir_correcciones = True
+            else:
+                titulos.append("".join(elem.itertext()))
+
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
     except Exception as e:
         print(f"Error leyendo tablas en {nombre_archivo}: {e}")
-        return []
+        return [], []
+
+    return tablas, titulos
 
 
 # -----------------------------------------------------------------------------
 # Utilidades de parsing HTML
 # -----------------------------------------------------------------------------
-def _extraer_humedad(soup, nombre_archivo):
+def _extraer_humedad(titulos, nombre_archivo):
     """
-    Extrae el valor de humedad relativa desde etiquetas <h3> del HTML.
+    Extrae el valor de humedad relativa desde los textos de las
+    etiquetas <h3> del HTML.
     """
     try:
-        for tag in soup.find_all("h3"):
-            match = re.search(r"(\d+(\.\d+)?)%", tag.get_text())
+        for texto in titulos:
+            match = _RE_HUMEDAD.search(texto)
             if match:
                 return float(match.group(1))
     except Exception as e:
@@ -97,9 +216,32 @@ def _asegurar_datetime(fecha, nombre_parametro):
 # -----------------------------------------------------------------------------
 # Búsqueda robusta de archivos HTML
 # -----------------------------------------------------------------------------
-from pathlib import Path
-from datetime import datetime
-import re
+def _scandir_html(directorio):
+    """
+    Recorre recursivamente un directorio con "os.scandir" y entrega las
+    entradas (os.DirEntry) de archivos con extensión ".html".
+
+    Se usan los metadatos ya cacheados en cada DirEntry, evitando las
+    llamadas adicionales a stat() que realiza "Path.rglob". Los
+    subdirectorios no accesibles se omiten y los enlaces simbólicos a
+    directorios no se siguen.
+
+    Se ignoran explícitamente archivos basura generados por macOS
+    (prefijo '._'), los cuales NO son HTML válidos.
+    """
+    try:
+        with os.scandir(directorio) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    yield from _scandir_html(entrada.path)
+                elif (
+                    entrada.name.endswith(".html")
+                    and not entrada.name.startswith("._")
+                    and entrada.is_file()
+                ):
+                    yield entrada
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
 
 
 def _buscar_reportes_html(
@@ -136,94 +278,102 @@ def _buscar_reportes_html(
     Retorna
     -------
     list[pathlib.Path]
-        Lista ordenada de rutas a archivos HTML válidos dentro del rango.
+        Lista de rutas a archivos HTML válidos dentro del rango, ordenada
+        por la fecha del nombre del archivo.
     """
     data_dir = Path(data_dir)
     resultados = []
 
     # Patrón: corrections_report_YYYY-MM-DD.html
-    patron = re.compile(
-        rf"^{re.escape(nombre_base)}_(\d{{4}}-\d{{2}}-\d{{2}})\.html$"
-    )
+    # Se filtra por prefijo y largo del nombre, y la fecha se obtiene por
+    # posición; strptime descarta los nombres con fechas mal formadas
+    prefijo = f"{nombre_base}_"
+    largo_nombre = len(prefijo) + len("YYYY-MM-DD.html")
 
-    for path in data_dir.rglob("*.html"):
-        nombre = path.name
-
-        # ------------------------------------------------------------------
-        # Ignorar archivos basura de macOS (AppleDouble)
-        # ------------------------------------------------------------------
-        if nombre.startswith("._"):
-            continue
+    for entrada in _scandir_html(data_dir):
+        nombre = entrada.name
 
-        match = patron.match(nombre)
-        if not match:
+        if len(nombre) != largo_nombre or not nombre.startswith(prefijo):
             continue
 
         try:
             fecha_archivo = datetime.strptime(
-                match.group(1), formato_fecha
+                nombre[len(prefijo):-len(".html")], formato_fecha
             )
         except ValueError:
             continue
 
         if fecha_inicio <= fecha_archivo <= fecha_fin:
-            resultados.append(path)
+            resultados.append((fecha_archivo, entrada.path))
 
-    return sorted(resultados)
+    # Se ordena por la fecha ya extraída (y la ruta como desempate), sin
+    # comparar objetos Path
+    resultados.sort()
+
+    return [Path(ruta) for _, ruta in resultados]
 
 # -----------------------------------------------------------------------------
 # Procesamiento principal de tablas
 # -----------------------------------------------------------------------------
-def _procesar_tablas(tablas, soup, nombre_archivo):
+def _procesar_tablas(tablas, titulos, nombre_archivo):
     """
     Procesa las tablas extraídas de un archivo HTML y genera DataFrames
     consolidados con la información de correcciones.
     """
     resultados = []
 
+    # La humedad es única por archivo: se obtiene una sola vez y no por
+    # cada par de tablas
+    humidity = _extraer_humedad(titulos, nombre_archivo)
+    if humidity is None:
+        humidity = np.nan
+
     for i in range(0, len(tablas) - 1, 2):
         try:
             n_repeat = tablas[i + 1].shape[0]
             if n_repeat == 0:
                 continue
 
-            tabla_transpuesta = tablas[i].T
+            # Tabla informativa: pares campo/valor, leídos como diccionario
+            # en lugar de transponer la tabla
+            info = dict(zip(tablas[i].index, tablas[i].iloc[:, 0]))
 
-            columnas_req = {"Timestamp", "Delay line number"}
-            if not columnas_req.issubset(tabla_transpuesta.columns):
+            if not all(col in info for col in _COLUMNAS_REQ):
                 continue
 
-            test_pd = tabla_transpuesta[list(columnas_req)].copy()
-            test_pd["Timestamp"] = pd.to_datetime(
-                test_pd["Timestamp"], errors="coerce"
-            )
-
-            if test_pd.empty:
-                continue
-
-            test_pd_repeated = pd.concat(
-                [test_pd] * n_repeat
-            ).reset_index(drop=True)
-
-            tabla_correcciones = (
-                tablas[i + 1]
-                .droplevel(0, axis=1)
-                .rename_axis("Rail number")
-                .reset_index(drop=False)
+            timestamp = pd.to_datetime(
+                [info["Timestamp"]],
+                format=_FORMATO_TIMESTAMP,
+                errors="coerce"
+            ).to_numpy()
+
+            # Tabla de correcciones: el índice es el número de riel y de
+            # las columnas de dos niveles solo se conserva el segundo; se
+            # toman los arreglos sin reconstruir índices intermedios
+            correcciones = tablas[i + 1]
+            columnas_correcciones = dict(
+                zip(
+                    correcciones.columns.get_level_values(1),
+                    (serie.to_numpy() for _, serie in correcciones.items())
+                )
             )
 
-            humidity = _extraer_humedad(soup, nombre_archivo)
-
-            humedad_df = pd.DataFrame({
-                "Tunnel Relative Humidity": [
-                    f"{humidity}%" if humidity is not None else None
-                ] * n_repeat
-            })
-
+            # Las columnas se construyen directamente como arreglos y se
+            # combinan en un único DataFrame, sin concatenaciones intermedias
             resultados.append(
-                pd.concat(
-                    [test_pd_repeated, humedad_df, tabla_correcciones],
-                    axis=1
+                pd.DataFrame(
+                    {
+                        "Timestamp": np.repeat(timestamp, n_repeat),
+                        "Delay line number": np.repeat(
+                            info["Delay line number"], n_repeat
+                        ),
+                        "Tunnel Relative Humidity": np.full(
+                            n_repeat, humidity, dtype="float32"
+                        ),
+                        "Rail number": correcciones.index.to_numpy(),
+                        **columnas_correcciones,
+                    },
+                    copy=False,
                 )
             )
 
@@ -231,3 +381,23 @@ def _procesar_tablas(tablas, soup, nombre_archivo):
             print(f"Error procesando tablas en {nombre_archivo}: {e}")
 
     return resultados
+
+
+# -----------------------------------------------------------------------------
+# Procesamiento de un reporte completo
+# -----------------------------------------------------------------------------
+def _procesar_un_reporte(path):
+    """
+    Lee, parsea y procesa un único reporte HTML, retornando la lista de
+    DataFrames generada por "_procesar_tablas".
+
+    Es una función de nivel de módulo y sin dependencias de Streamlit,
+    por lo que puede ejecutarse en un proceso de trabajo independiente.
+    """
+    path = Path(path)
+    nombre_archivo = path.name
+
+    with _leer_html(path) as contenido:
+        tablas, titulos = _leer_tablas(contenido, nombre_archivo)
+
+    return _procesar_tablas(tablas, titulos, nombre_archivo)